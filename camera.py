@@ -0,0 +1,86 @@
+import collections
+import pygame
+import settings
+
+
+class ChunkCache():
+    """Lazily built square pieces of a map layer, the least recently drawn are evicted first.
+
+    Args:
+        builder (callable): Takes the (x, y) index of a chunk and returns its Surface.
+        max_chunks (int): Chunks kept in memory, derived from settings.chunk_cache_bytes by default.
+    """
+    def __init__(self, builder, max_chunks: int | None = None) -> None:
+        self.builder = builder
+        if max_chunks is None:
+            chunk_bytes = (settings.chunk_size * settings.cell_unit) ** 2 * 4
+            max_chunks = max(settings.chunk_cache_bytes // chunk_bytes, 1)
+        self.max_chunks = max_chunks
+        self.chunks: collections.OrderedDict = collections.OrderedDict()
+
+    def get(self, chunk: tuple[int, int]) -> pygame.Surface:
+        surface = self.chunks.get(chunk)
+        if surface is None:
+            surface = self.chunks[chunk] = self.builder(chunk)
+            while len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(chunk)
+        return surface
+
+    def invalidate(self, chunk: tuple[int, int]):
+        self.chunks.pop(chunk, None)
+
+    def clear(self):
+        self.chunks.clear()
+
+
+def chunk_of(x: int, y: int) -> tuple[int, int]:
+    return x // settings.chunk_size, y // settings.chunk_size
+
+
+def chunk_cells(chunk: tuple[int, int], array: list[list[int]]):
+    """Yields (x, y, value) for the cells of array inside a chunk, rows may have different lengths."""
+    x_start = chunk[0] * settings.chunk_size
+    y_start = chunk[1] * settings.chunk_size
+    for y in range(y_start, min(y_start + settings.chunk_size, len(array))):
+        row = array[y]
+        for x in range(x_start, min(x_start + settings.chunk_size, len(row))):
+            yield x, y, row[x]
+
+
+class Camera():
+    """The part of the map shown in the window, in map pixels."""
+    def __init__(self, screen: pygame.Surface, map_width: int, map_height: int) -> None:
+        self.screen = screen
+        self.rect = screen.get_rect()
+        self.map_width = map_width * settings.cell_unit
+        self.map_height = map_height * settings.cell_unit
+
+    def follow(self, entity):
+        """Centers the view on an entity without showing past the map borders."""
+        self.rect.centerx = round(entity.offset[0] * settings.cell_unit + settings.cell_unit / 2)
+        self.rect.centery = round(entity.offset[1] * settings.cell_unit + settings.cell_unit / 2)
+        self.rect.x = max(min(self.rect.x, self.map_width - self.rect.width), 0)
+        self.rect.y = max(min(self.rect.y, self.map_height - self.rect.height), 0)
+
+    def draw(self, chunk_cache: ChunkCache):
+        """Blits the chunks of a layer that are in view."""
+        chunk_pixels = settings.chunk_size * settings.cell_unit
+        for chunk_y in range(self.rect.top // chunk_pixels, (self.rect.bottom - 1) // chunk_pixels + 1):
+            for chunk_x in range(self.rect.left // chunk_pixels, (self.rect.right - 1) // chunk_pixels + 1):
+                self.screen.blit(
+                    chunk_cache.get((chunk_x, chunk_y)),
+                    (chunk_x * chunk_pixels - self.rect.x, chunk_y * chunk_pixels - self.rect.y)
+                )
+
+    def blit(self, surface: pygame.Surface, position):
+        """Blits a surface positioned in map pixels, skipped when out of view.
+
+        Args:
+            surface (pygame.Surface): Surface to draw.
+            position (tuple): Top left corner of the surface on the map.
+        """
+        rect = surface.get_rect(topleft=position)
+        if self.rect.colliderect(rect):
+            self.screen.blit(surface, (rect.x - self.rect.x, rect.y - self.rect.y))
@@ -7,6 +7,8 @@ import screen as s
 from maps import default_map as map
 
 
+ate_pellet = pygame.event.custom_type()  # a power pellet was eaten, main switches the ghost modes
+
 
 class Entity:
     entities: set[object] =  set()  # to loop through routines
@@ -51,7 +53,7 @@ class Entity:
     
     def graphic_update(self):
         self.graphic_rect.center = (self.offset[0] * s.cu + s.cu/2, self.offset[1] * s.cu + s.cu/2)
-        s.screen.blit(self.surface, self.graphic_rect)
+        s.view.blit(self.surface, self.graphic_rect.topleft)
     
     def full_cell_check(self):
         if self.x == round(self.offset[0], 3) and self.y == round(self.offset[1], 3):
@@ -109,14 +111,6 @@ class Player(Entity):
         self.pellet_handling()
     
 
-    def input_assignement(self, input):
-        self.input = {
-            pygame.K_UP: (0, -1),
-            pygame.K_LEFT: (-1, 0),
-            pygame.K_DOWN: (0, 1),
-            pygame.K_RIGHT: (1, 0),
-        }[input]
-    
     def input_is_real(self):
         return self.input is not None and self.direction_vector != self.input
     
@@ -149,16 +143,17 @@ class Player(Entity):
         )
     
     def pellet(self):
-        return map.points[self.y][self.x]
+        return map.points.get(self.x, self.y)
             
     def pellet_handling(self):
-        if self.pellet():
-            if self.pellet == 2:
+        pellet = self.pellet()
+        if pellet:
+            if pellet == 2:
                 self.power_pellet_handling()
             map.remove_point(self.x, self.y)
     
-    def power_pellet_handling(self):
-        raise NotImplementedError
+    def power_pellet_handling(self):  # the mode timer lives in main
+        pygame.event.post(pygame.event.Event(ate_pellet))
 
         
 
@@ -246,10 +241,10 @@ class Ennemy(Entity):
         pygame.draw.circle(circle_surface, self.surface.get_at(self.surface.get_rect().center), 
                            (s.cu/2, s.cu/2), s.cu/3)
         if self.chase_target == inky.inky_target:
-            s.screen.blit(circle_surface,
-                          tuple(i * s.cu for i in (pak.x + 2 * pak.direction_vector[0], 
-                                                   pak.y + 2 * pak.direction_vector[1])))
-        s.screen.blit(circle_surface, tuple(i * s.cu for i in self.target_selection()))
+            s.view.blit(circle_surface,
+                        tuple(i * s.cu for i in (pak.x + 2 * pak.direction_vector[0], 
+                                                 pak.y + 2 * pak.direction_vector[1])))
+        s.view.blit(circle_surface, tuple(i * s.cu for i in self.target_selection()))
 
 
     def no_backtrack(self, array: list[list[int]]):
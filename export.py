@@ -0,0 +1,105 @@
+import atexit
+import os
+import queue
+import struct
+import threading
+import zlib
+import pygame
+
+
+def png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def encode_png(width: int, height: int, pixels: bytes, compression: int = 6) -> bytes:
+    """Encodes RGB pixels, zlib releases the GIL so threads can encode in parallel.
+
+    Args:
+        width (int): Width of the image.
+        height (int): Height of the image.
+        pixels (bytes): Rows of RGB pixels, top to bottom.
+        compression (int, optional): zlib level. Defaults to 6.
+
+    Returns:
+        bytes: The PNG file.
+    """
+    stride = width * 3
+    rows = b''.join(b'\x00' + pixels[y * stride:(y + 1) * stride] for y in range(height))  # 0: no filter
+    return (b'\x89PNG\r\n\x1a\n'
+            + png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + png_chunk(b'IDAT', zlib.compress(rows, compression))
+            + png_chunk(b'IEND', b''))
+
+
+class FrameExporter():
+    """Writes frames from background threads, submit blocks when the queue is full.
+
+    Args:
+        directory (str): Where the frames are written.
+        size (tuple[int, int]): Size of the frames.
+        frame_format (str, optional): 'png' for a numbered PNG sequence, 'raw' for one file of RGB frames.
+        workers (int, optional): Encoding threads, raw frames use a single writer. Defaults to the cpu count.
+        queue_size (int, optional): Frames waiting to be written before the game waits for the disk.
+    """
+    def __init__(self, directory: str, size: tuple[int, int], frame_format: str = 'png',
+                 workers: int | None = None, queue_size: int = 64) -> None:
+        if frame_format not in ('png', 'raw'):
+            raise ValueError(f'Unknown frame format: {frame_format}')
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.width, self.height = size
+        self.frame_format = frame_format
+        self.frame_count: int = 0
+        self.frames: queue.Queue = queue.Queue(queue_size)
+        self.error: Exception | None = None  # raised by a writer, reported by submit and close
+
+        if frame_format == 'raw':
+            workers = 1  # frames are appended in order
+            self.raw_file = open(os.path.join(directory, f'frames_{self.width}x{self.height}_rgb.raw'), 'wb')
+        elif workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = [threading.Thread(target=self.work, daemon=True) for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+        atexit.register(self.close)
+
+    def submit(self, surface: pygame.Surface):
+        """Copies a frame and queues it, waits if the writers are behind."""
+        frame = (self.frame_count, pygame.image.tostring(surface, 'RGB'))
+        while True:
+            if self.error is not None:
+                raise self.error
+            try:
+                self.frames.put(frame, timeout=0.1)  # wakes up to notice a writer that failed
+                break
+            except queue.Full:
+                pass
+        self.frame_count += 1
+
+    def work(self):
+        while (frame := self.frames.get()) is not None:
+            if self.error is not None:
+                continue  # keep draining so close doesn't wait on a full queue
+            index, pixels = frame
+            try:
+                if self.frame_format == 'raw':
+                    self.raw_file.write(pixels)
+                else:
+                    with open(os.path.join(self.directory, f'frame_{index:06}.png'), 'wb') as file:
+                        file.write(encode_png(self.width, self.height, pixels))
+            except Exception as error:
+                self.error = error
+
+    def close(self):
+        """Waits for every queued frame to be written."""
+        if not self.workers:
+            return
+        for _ in self.workers:
+            self.frames.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+        if self.frame_format == 'raw':
+            self.raw_file.close()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,289 @@
+import array
+import struct
+import pathing
+import pellets
+import settings
+
+entity_fields = 8  # offset x, offset y, direction x, direction y, speed, moving, input x, input y
+compact_threshold = 64  # eaten pellets kept as an overlay before being merged into a new store
+
+header_format = struct.Struct('<HHHIi??')  # width, height, entity count, timer, point count, chase mode, game over
+
+
+class GameState():
+    """Display-free copy of the game, cheap to fork for lookahead search.
+
+    Entities are a flat array of floats, an input of (0, 0) means none is buffered.
+    Pellets are a PelletStore shared by every fork, pellets eaten since the store
+    was made are kept in a small set so a fork only copies what changed.
+    step plays a tick the way classes.py and main.py do, so a search can evaluate
+    moves without touching the live game.
+
+    Args:
+        walls (list[list[int]]): Walls array, shared and never modified.
+        store (pellets.PelletStore): Pellets, shared and never modified.
+        entities (array.array): entity_fields floats per entity.
+        rules (tuple, optional): What step needs to know of each entity, see rules_of. Defaults to none.
+    """
+    __slots__ = ('walls', 'store', 'eaten', 'entities', 'rules',
+                 'timer', 'point_count', 'chase_mode', 'game_over')
+
+    def __init__(self, walls: list[list[int]], store: pellets.PelletStore, entities: array.array,
+                 timer: int = 0, point_count: int = 0, chase_mode: bool = False, game_over: bool = False,
+                 rules: tuple = ()) -> None:
+        self.walls = walls
+        self.store = store
+        self.rules = rules
+        self.eaten: set[tuple[int, int]] = set()  # pellets eaten since self.store was made
+        self.entities = entities
+        self.timer = round(timer)  # main.timer is a float when frames aren't paced
+        self.point_count = point_count
+        self.chase_mode = chase_mode
+        self.game_over = game_over
+
+    @classmethod
+    def capture(cls, entities: list, game_map, timer: int = 0, point_count: int = 0,
+                chase_mode: bool = False, game_over: bool = False):
+        """Copies the live game objects.
+
+        Args:
+            entities (list): Entities in a stable order, see network.entity_list.
+            game_map (maps.Map): The map, its points are copied.
+        """
+        entity_array = array.array('d')
+        for entity in entities:
+            buffered_input = getattr(entity, 'input', None) or (0, 0)
+            entity_array.extend((*entity.offset, *entity.direction_vector, entity.speed_scalar,
+                                 any(entity.speed_vector), *buffered_input))
+        return cls(game_map.walls, game_map.points.copy(), entity_array, timer, point_count, chase_mode, game_over,
+                   rules_of(entities))
+
+    def fork(self):
+        """Returns an independent state, only the entities and the eaten overlay are copied."""
+        state = GameState(self.walls, self.store, self.entities[:],
+                          self.timer, self.point_count, self.chase_mode, self.game_over, self.rules)
+        state.eaten = self.eaten.copy()
+        return state
+
+    def pellet(self, x: int, y: int) -> int:
+        if (x, y) in self.eaten:
+            return 0
+        return self.store.get(x, y)
+
+    @property
+    def remaining(self) -> int:
+        return self.store.remaining - len(self.eaten)
+
+    def eat_pellet(self, x: int, y: int) -> int:
+        """Removes a pellet.
+
+        Returns:
+            int: The value of the removed pellet, 0 if there was none.
+        """
+        value = self.pellet(x, y)
+        if value:
+            self.eaten.add((x, y))
+            if len(self.eaten) > compact_threshold:
+                self.compact()
+        return value
+
+    def compact(self):
+        """Merges the eaten overlay into a new store, other forks keep the old one."""
+        store = self.store.copy()
+        for x, y in self.eaten:
+            store.eat(x, y)
+        self.store = store
+        self.eaten = set()
+
+    def entity(self, index: int) -> tuple:
+        start = index * entity_fields
+        return tuple(self.entities[start:start + entity_fields])
+
+    def set_entity(self, index: int, x: float, y: float, direction: tuple[int, int],
+                   moving: bool = True, buffered_input: tuple[int, int] | None = None):
+        start = index * entity_fields
+        speed = self.entities[start + 4]
+        self.entities[start:start + entity_fields] = array.array(
+            'd', (x, y, *direction, speed, moving, *(buffered_input or (0, 0))))
+
+    def to_bytes(self) -> bytes:
+        if self.eaten:
+            self.compact()
+        return (header_format.pack(self.store.width, self.store.height, len(self.entities) // entity_fields,
+                                   self.timer, self.point_count, self.chase_mode, self.game_over)
+                + self.entities.tobytes() + bytes(self.store.cells))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, walls: list[list[int]], rules: tuple = ()):
+        """Restores a state saved by to_bytes.
+
+        Args:
+            data (bytes): Output of to_bytes.
+            walls (list[list[int]]): Walls of the map the state was saved on.
+            rules (tuple, optional): rules_of the entities, needed by step. Defaults to none.
+        """
+        width, height, entity_count, timer, point_count, chase_mode, game_over = header_format.unpack_from(data)
+        offset = header_format.size
+        entities = array.array('d')
+        entities.frombytes(data[offset:offset + entity_count * entity_fields * entities.itemsize])
+        offset += entity_count * entity_fields * entities.itemsize
+        store = pellets.PelletStore([data[offset + y * width:offset + (y + 1) * width] for y in range(height)])
+        return cls(walls, store, entities, timer, point_count, chase_mode, game_over, rules)
+
+    def apply(self, entities: list, game_map) -> tuple[int, int, bool, bool]:
+        """Puts the live game objects back in this state.
+
+        The other fields live in main.py and classes.Ennemy, so they are returned
+        for the caller to assign. Meant for local games: network clients are never
+        told that a pellet came back, see maps.Map.restore_points.
+
+        Args:
+            entities (list): The entities the state was captured from, in the same order.
+            game_map (maps.Map): The map the state was captured from.
+
+        Returns:
+            tuple: (timer, point count, chase mode, game over)
+        """
+        for index, entity in enumerate(entities):
+            x, y, direction_x, direction_y, _, moving, input_x, input_y = self.entity(index)
+            entity.offset[0] = x
+            entity.offset[1] = y
+            entity.update_position()
+            direction = (int(direction_x), int(direction_y))
+            if entity.direction_vector != direction:
+                entity.direction_update(direction)
+            entity.speed_vector = tuple(entity.speed_scalar * i for i in direction) if moving else (0, 0)
+            if hasattr(entity, 'input'):
+                entity.input = (int(input_x), int(input_y)) if input_x or input_y else None
+
+        if self.eaten:
+            self.compact()
+        game_map.restore_points(self.store.cells)
+        return self.timer, self.point_count, self.chase_mode, self.game_over
+
+    def step(self, milliseconds: int, direction: tuple[int, int] | None = None):
+        """Plays one tick like the main loop, nothing happens once the game is over or cleared.
+
+        Args:
+            milliseconds (int): Length of the tick, for the chase and scatter timer.
+            direction (tuple[int, int], optional): A newly pressed direction for the player. Defaults to None.
+        """
+        if self.game_over or not self.remaining:
+            return
+        if not self.rules:
+            raise ValueError('step needs the rules of the entities, see rules_of')
+        entities = [list(self.entity(index)) for index in range(len(self.rules))]
+        cells = [[round(entity[0]), round(entity[1])] for entity in entities]
+        player = next(index for index, (_, chase_target, _) in enumerate(self.rules) if chase_target is None)
+        blinky = next((index for index, (name, _, _) in enumerate(self.rules) if name == 'blinky'), None)
+        if direction is not None:
+            entities[player][6:8] = direction
+        ate_power_pellet = False
+
+        for index, (name, chase_target, scatter_target) in enumerate(self.rules):
+            entity, cell = entities[index], cells[index]
+            x, y = cell
+            if x == round(entity[0], 3) and y == round(entity[1], 3):  # full cell
+                if chase_target is None:
+                    ate_power_pellet |= self.player_full_cell(entity, x, y, cells, player)
+                else:
+                    target = self.ghost_target(chase_target, scatter_target, cell, entities[player],
+                                               cells[player], cells[blinky] if blinky is not None else None)
+                    self.ghost_full_cell(entity, x, y, target, cells[player])
+            if entity[5]:
+                entity[0] += entity[4] * entity[2]
+                entity[1] += entity[4] * entity[3]
+            cell[0], cell[1] = round(entity[0]), round(entity[1])
+
+        self.timer += round(milliseconds)
+        if self.timer > (settings.chase_duration if self.chase_mode else settings.scatter_duration):
+            self.switch_mode(entities, not self.chase_mode)
+        if ate_power_pellet:  # main.power_pellet_switch runs on the next frame's events
+            self.switch_mode(entities, False)
+
+        for index, entity in enumerate(entities):
+            start = index * entity_fields
+            self.entities[start:start + entity_fields] = array.array('d', entity)
+
+    def player_full_cell(self, entity: list, x: int, y: int, cells: list, player: int) -> bool:
+        """classes.Player.full_cell_routine, returns whether a power pellet was eaten."""
+        walls = self.walls
+        input_x, input_y = int(entity[6]), int(entity[7])
+        if ((input_x or input_y) and (input_x, input_y) != (entity[2], entity[3])
+                and walls[y + input_y][x + input_x] != 1 and x in range(0, 27)):
+            entity[2:4] = input_x, input_y
+            entity[5] = True
+            entity[6:8] = 0, 0
+        if y == 14:  # tunnel warp
+            if x == -1:
+                entity[0] = 28
+            elif x == 28:
+                entity[0] = -1
+        if walls[y + int(entity[3])][x + int(entity[2])] == 1:
+            entity[5] = False
+        if any(cell == [x, y] for index, cell in enumerate(cells) if index != player and self.rules[index][1]):
+            self.game_over = True
+        value = self.eat_pellet(x, y)
+        if value:
+            self.point_count += settings.pellet_value
+        return value == 2
+
+    def ghost_target(self, chase_target: str, scatter_target: tuple[int, int], cell: list,
+                     player: list, player_cell: list, blinky_cell: list | None) -> tuple[int, int]:
+        """classes.Ennemy.target_selection"""
+        if not self.chase_mode:
+            return scatter_target
+        player_x, player_y = player_cell
+        direction_x, direction_y = int(player[2]), int(player[3])
+        if chase_target == 'pinky_target':
+            return player_x + 4 * direction_x, player_y + 4 * direction_y
+        if chase_target == 'inky_target':
+            return ((player_x + 2 * direction_x - blinky_cell[0]) * 2 + blinky_cell[0],
+                    (player_y + 2 * direction_y - blinky_cell[1]) * 2 + blinky_cell[1])
+        if chase_target == 'clyde_target' and ((player_x - cell[0]) ** 2 + (player_y - cell[1]) ** 2) ** 0.5 <= 8:
+            return scatter_target
+        return player_x, player_y
+
+    def ghost_full_cell(self, entity: list, x: int, y: int, target: tuple[int, int], player_cell: list):
+        """classes.Ennemy.full_cell_routine"""
+        walls = self.walls
+        direction_x, direction_y = int(entity[2]), int(entity[3])
+        if [x, y] == player_cell:
+            self.game_over = True
+        if walls[y][x] == 2:
+            no_backtrack = list(walls)  # only the row behind the ghost is changed
+            no_backtrack[y - direction_y] = list(walls[y - direction_y])
+            no_backtrack[y - direction_y][x - direction_x] = 1
+            next_x, next_y = pathing.triangulation((x, y), target, no_backtrack, (1, 3))
+            entity[2:4] = next_x - x, next_y - y
+            entity[5] = True
+        elif walls[y + direction_y][x + direction_x] == 1:
+            if direction_x == 0:
+                entity[2:4] = (-1, 0) if walls[y][x + 1] == 1 else (1, 0)
+            else:
+                entity[2:4] = (0, -1) if walls[y + 1][x] == 1 else (0, 1)
+            entity[5] = True
+        if y == 14:  # tunnel warp
+            if x == -1:
+                entity[0] = 28
+            elif x == 28:
+                entity[0] = -1
+
+    def switch_mode(self, entities: list, chase_mode: bool):
+        """main.chase_switch and main.power_pellet_switch, ghosts turn around and the timer restarts."""
+        self.chase_mode = chase_mode
+        for index, (_, chase_target, _) in enumerate(self.rules):
+            if chase_target is not None:
+                entities[index][2] = -entities[index][2]
+                entities[index][3] = -entities[index][3]
+                entities[index][5] = True
+        self.timer = 0
+
+
+def rules_of(entities: list) -> tuple:
+    """(name, chase target name or None for the player, scatter target) of each entity, they never change."""
+    return tuple(
+        (entity.name, entity.chase_target.__name__, entity.scatter_target) if hasattr(entity, 'chase_target')
+        else (entity.name, None, None)
+        for entity in entities
+    )
@@ -0,0 +1,156 @@
+import atexit
+import struct
+import time
+import pygame
+
+key_directions = {
+    pygame.K_UP: (0, -1),
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_DOWN: (0, 1),
+    pygame.K_RIGHT: (1, 0),
+}
+
+replay_directions = tuple(key_directions.values())
+replay_format = struct.Struct('<BH')  # index in replay_directions or no_input, milliseconds the tick lasted
+no_input = 255
+
+
+class Replay():
+    """The new direction of each tick and how long the tick lasted, enough to play a local game again.
+
+    Args:
+        ticks (list, optional): (direction or None, milliseconds) per tick. Defaults to an empty replay.
+    """
+    def __init__(self, ticks: list[tuple[tuple[int, int] | None, int]] | None = None) -> None:
+        self.ticks = ticks if ticks is not None else []
+
+    def record(self, direction: tuple[int, int] | None, milliseconds: int):
+        self.ticks.append((direction, min(milliseconds, 0xFFFF)))  # a tick can last longer while the window is dragged
+
+    def save(self, path: str):
+        with open(path, 'wb') as file:
+            file.write(b''.join(
+                replay_format.pack(no_input if direction is None else replay_directions.index(direction), milliseconds)
+                for direction, milliseconds in self.ticks
+            ))
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, 'rb') as file:
+            data = file.read()
+        if len(data) % replay_format.size:
+            raise ValueError(f'{path} is not a replay, its size is not a multiple of {replay_format.size}')
+        return cls([
+            (None if index == no_input else replay_directions[index], milliseconds)
+            for index, milliseconds in replay_format.iter_unpack(data)
+        ])
+
+
+class InputBuffer():
+    """Polls the arrow keys once per tick and times how long a turn takes to happen.
+
+    The latest newly pressed direction is handed to the player as its input, it stays
+    buffered until the player turns at a full cell or another direction is pressed.
+    KEYDOWN events passed to key_down count as presses too, so a tap released before
+    the poll isn't lost. With a replay the directions are read from it instead of the keyboard.
+
+    Args:
+        player (classes.Player): The player the input is for.
+        report (bool, optional): Print the latency summary on exit. Defaults to False.
+        replay (Replay, optional): Directions to play back. Defaults to None.
+    """
+    def __init__(self, player, report: bool = False, replay: Replay | None = None) -> None:
+        self.player = player
+        self.replay = replay
+        self.held_keys: set[int] = set()
+        self.tapped_key: int | None = None  # latest arrow KEYDOWN since the last poll
+        self.intent: tuple[int, int] | None = None
+        self.intent_tick: int | None = None  # None once the player turned
+        self.intent_time: float = 0
+
+        self.latency_ticks: list[int] = []
+        self.latency_ms: list[float] = []
+        self.superseded: int = 0  # directions replaced before the player could turn
+        if report:
+            atexit.register(self.report)
+
+    @property
+    def pending(self) -> bool:
+        """Whether the player hasn't turned to the latest direction yet."""
+        return self.intent_tick is not None
+
+    def key_down(self, key: int):
+        """Records an arrow KEYDOWN event, call from the event loop before poll."""
+        if key in key_directions:
+            self.tapped_key = key
+            self.held_keys.add(key)  # the poll doesn't count it a second time
+
+    def poll(self, tick: int) -> tuple[int, int] | None:
+        """Reads the keyboard, call once per tick before the entities move.
+
+        Returns:
+            tuple[int, int] | None: The direction if a new one was pressed this tick.
+        """
+        if self.replay is not None:
+            new_direction = self.replay.ticks[tick][0] if tick < len(self.replay.ticks) else None
+        else:
+            new_direction = self.pressed_direction()
+
+        if new_direction is None or new_direction == self.intent:
+            return None
+        if self.intent_tick is not None:
+            self.superseded += 1
+        self.intent = new_direction
+        self.player.input = new_direction
+        if new_direction == self.player.direction_vector:  # nothing to turn to
+            self.intent_tick = None
+        else:
+            self.intent_tick = tick
+            self.intent_time = time.perf_counter()
+        return new_direction
+
+    def pressed_direction(self) -> tuple[int, int] | None:
+        pressed = pygame.key.get_pressed()
+        new_direction = key_directions[self.tapped_key] if self.tapped_key is not None else None
+        self.tapped_key = None
+        for key, direction in key_directions.items():
+            if pressed[key]:
+                if key not in self.held_keys:
+                    self.held_keys.add(key)
+                    new_direction = direction
+            else:
+                self.held_keys.discard(key)
+        return new_direction
+
+    def record(self, tick: int):
+        """Records the latency if the player turned, call once per tick after the entities moved."""
+        if self.intent_tick is not None and self.player.direction_vector == self.intent:
+            self.latency_ticks.append(tick - self.intent_tick)
+            self.latency_ms.append((time.perf_counter() - self.intent_time) * 1000)
+            self.intent_tick = None
+
+    def summary(self) -> dict:
+        """Input to turn latency, meant to be compared between releases.
+
+        Returns:
+            dict: turn count, mean and max latency in ticks and ms, 95th percentile in ms.
+        """
+        count = len(self.latency_ticks)
+        if not count:
+            return {'turns': 0, 'superseded': self.superseded}
+        return {
+            'turns': count,
+            'superseded': self.superseded,
+            'mean_ticks': sum(self.latency_ticks) / count,
+            'max_ticks': max(self.latency_ticks),
+            'mean_ms': sum(self.latency_ms) / count,
+            'p95_ms': sorted(self.latency_ms)[int(0.95 * (count - 1))],
+            'max_ms': max(self.latency_ms),
+        }
+
+    def report(self):
+        summary = self.summary()
+        print(f"Turns: {summary['turns']}, {summary['superseded']} inputs replaced before turning")
+        if summary['turns']:
+            print(f"Input to turn latency: {summary['mean_ticks']:.2f} ticks mean, {summary['max_ticks']} max, "
+                  f"{summary['mean_ms']:.1f} ms mean, {summary['p95_ms']:.1f} ms p95, {summary['max_ms']:.1f} ms max")
@@ -1,24 +1,63 @@
+import atexit
+import os
 import pygame
 import sys
 import settings
+if settings.export_directory:  # must be set before screen makes the window
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
 import screen
 import classes
 import maps
+import profiling
+import network
+import export
+import inputs
 
 
 pygame.init()
 
 
 timer: int = 0
+frame: int = 0
 clock = pygame.time.Clock()
 
 sprite_update = pygame.event.custom_type()
-pygame.time.set_timer(sprite_update, 100)
+if not settings.export_directory:  # exported frames animate on simulated time instead
+    pygame.time.set_timer(sprite_update, 100)
 
-pygame.key.set_repeat(15)
+point_count: int = 0
 
-point_count: int = -settings.pellet_value
-ate_pellet = pygame.event.custom_type()
+profiler = profiling.FrameProfiler(settings.profile_allocations)
+profiler.start()
+
+entities = network.entity_list(classes.Entity.entities)
+server = client = None
+if settings.network_mode == 'server':
+    server = network.Server(settings.server_address, entities, maps.default_map, [classes.pak])
+elif settings.network_mode == 'client':
+    client = network.Client(settings.server_address)
+
+replay = recording = None
+if settings.export_directory:  # a headless game can't be played, it can only be replayed
+    if not settings.replay_file or settings.network_mode:
+        sys.exit('Export mode plays back a local game, set settings.replay_file to one recorded without network_mode')
+    replay = inputs.Replay.load(settings.replay_file)
+elif settings.replay_file and not settings.network_mode:
+    recording = inputs.Replay()
+    atexit.register(recording.save, settings.replay_file)
+
+input_buffer = inputs.InputBuffer(classes.pak, settings.report_input_latency, replay)
+
+exporter = None
+if settings.export_directory:
+    exporter = export.FrameExporter(settings.export_directory, screen.screen.get_size(), settings.export_format)
+
+def end_game(message):
+    if server:  # clients are told the game ended before the server stops
+        server.broadcast(game_over=True)
+        server.close()
+    print(message)
+    sys.exit()
 
 def chase_switch(duration):
     global timer
@@ -29,45 +68,102 @@ def chase_switch(duration):
             ennemy.turn_around()
         timer = 0
 
+def power_pellet_switch():  # until there is a frightened mode, ghosts scatter away
+    global timer
+
+    classes.Ennemy.chase_mode = False
+    for ennemy in classes.Ennemy.ennemies:
+        ennemy.turn_around()
+    timer = 0  # a full scatter from now, chase_switch won't flip it back early
+
 
 while True:
-    for event in pygame.event.get():
-        if event.type == sprite_update:
-            for entity in classes.Entity.entities:
-                entity.sprite_next()
-        elif event.type == pygame.KEYDOWN:
-            if event.key in (pygame.K_LEFT, pygame.K_UP, pygame.K_RIGHT, pygame.K_DOWN):
-                classes.pak.input_assignement(event.key)
-            elif event.key is pygame.K_ESCAPE:
+    with profiler.section('events'):
+        for event in pygame.event.get():
+            if event.type == sprite_update:
+                for entity in classes.Entity.entities:
+                    entity.sprite_next()
+            elif event.type == classes.ate_pellet:
+                power_pellet_switch()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                sys.exit()
+            elif event.type == pygame.KEYDOWN:
+                input_buffer.key_down(event.key)
+            elif event.type == pygame.QUIT:
                 sys.exit()
-        elif event.type == pygame.QUIT:
-            sys.exit()
 
-    screen.screen.blit(screen.background, (0, 0))  # reset background
+        direction = input_buffer.poll(frame)  # taps from the events above and keys held down
+        if client and (direction or input_buffer.pending):  # sent until a snapshot shows the turn
+            client.send_input(input_buffer.intent)
+
+    if server:
+        server.poll()
 
-    if maps.default_map.modified:
-        maps.default_map.sprite_update()
-        point_count += settings.pellet_value
+    screen.view.follow(classes.pak)
+    screen.view.draw(screen.background)  # reset background
+
+    with profiler.section('map'):
+        if maps.default_map.modified:  # a client can get many pellets from one snapshot
+            maps.default_map.modified = False
+            point_count = settings.pellet_value * len(maps.default_map.removed_points)
     
     if classes.Ennemy.game_over:
-        print(f'Score: {point_count}')
-        sys.exit()
+        end_game(f'Score: {point_count}')
+
+    if maps.default_map.points.cleared:
+        end_game(f'Level cleared, score: {point_count}')
+
+    if client and client.game_over:
+        end_game(f'Game over, score: {point_count}')
+
+    if client and not client.connected:
+        end_game('Disconnected from the server')
+
+    if replay and frame == len(replay.ticks):  # the recorded game was quit
+        end_game(f'Replay ended, score: {point_count}')
     
     maps.default_map.graphic_update()
 
-    for entity in classes.Entity.entities:
-        entity.routine()
+    with profiler.section('entities'):
+        if client:  # the server simulates, entities are only drawn where it says
+            client.receive()
+            client.apply(entities, maps.default_map)
+            for entity in entities:
+                entity.graphic_update()
+        else:
+            for entity in entities:
+                entity.routine()
+
+    input_buffer.record(frame)
+
+    if server:
+        with profiler.section('network'):
+            server.broadcast()
     
     if settings.display_targets:
-        for entity in classes.Ennemy.ennemies:
-            entity.target_display()
+        with profiler.section('targets'):
+            for entity in classes.Ennemy.ennemies:
+                entity.target_display()
 
     pygame.display.flip()
 
-    clock.tick(60)
-    timer += clock.get_time()
-    
-    if classes.Ennemy.chase_mode:
-        chase_switch(settings.chase_duration)
+    frame += 1
+    if exporter:  # replayed time, frames are made as fast as they can be written
+        exporter.submit(screen.screen)
+        timer += replay.ticks[frame - 1][1]
+        if frame % 6 == 0:  # the sprite_update timer runs on wall clock time
+            for entity in classes.Entity.entities:
+                entity.sprite_next()
     else:
-        chase_switch(settings.scatter_duration)
+        clock.tick(60)
+        timer += clock.get_time()
+        if recording:
+            recording.record(direction, clock.get_time())
+    
+    if not client:  # modes are switched by the server
+        if classes.Ennemy.chase_mode:
+            chase_switch(settings.chase_duration)
+        else:
+            chase_switch(settings.scatter_duration)
+
+    profiler.end_frame()
@@ -1,13 +1,16 @@
 import pygame
 import settings
 import tools
+import camera
+import pellets
 # in python 3.9 my tests showed list access to be much faster than tuple acces, in 3.8 tuples were slightly faster
 
 
 class Map():
     def __init__(self, walls_map, point_map, wall_type_map = None) -> None:
         self.walls: list[list[int]] = walls_map # 0 is empty, 1 is a wall, 2 is a turning point, 3 is a wall corner, 4 is an unreachable cell
-        self.points: list[list[int]] = point_map
+        self.points = pellets.PelletStore(point_map)
+        self.initial_points = bytes(self.points.cells)  # to know which pellets a restore leaves eaten
         
         if wall_type_map is None: 
             self.wall_types: list[list[int]] = tools.wall_type_mapper(tools.unreachable_mapper(walls_map))
@@ -15,30 +18,52 @@ class Map():
             self.wall_types: list[list[int]] = wall_type_map
         
         self.modified: bool = True
+        self.removed_points: list[tuple[int, int]] = []  # in order of removal, for network deltas
         self.width = len(walls_map[0])
         self.height = len(walls_map)
 
+        self.dot = pygame.image.load('image_files\dot.png')
+        self.power_pellet = pygame.image.load('image_files\pellet.png')
+        self.pellets = camera.ChunkCache(self.pellet_chunk)
+
     def remove_point(self, x, y):
-        self.points[y][x] = 0
+        self.points.eat(x, y)
         self.modified = True
+        self.removed_points.append((x, y))
+        self.pellets.invalidate(camera.chunk_of(x, y))  # only this chunk gets redrawn
     
-    def sprite_update(self):
-        dot = pygame.image.load('image_files\dot.png')
-
-        self.modified = False
+    def restore_points(self, cells: bytes):
+        """Puts back a saved pellet grid, removed_points is rebuilt to list the pellets it has eaten.
 
-        self.sprite = pygame.Surface((self.width * settings.cell_unit, self.height * settings.cell_unit))
-        self.sprite.fill((0,0,0,0))
-        self.sprite.set_colorkey((0,0,0,0))
+        Network clients only learn of removed pellets, one that comes back stays eaten for them.
+        """
+        self.points.set_cells(cells)
+        width = self.points.width
+        self.removed_points = [
+            (i % width, i // width)
+            for i, (initial, cell) in enumerate(zip(self.initial_points, cells))
+            if initial and not cell
+        ]
+        self.modified = True
+        self.pellets.clear()
+    
+    def pellet_chunk(self, chunk):
+        chunk_surface = pygame.Surface((settings.chunk_size * settings.cell_unit, settings.chunk_size * settings.cell_unit))
+        chunk_surface.fill((0,0,0,0))
+        chunk_surface.set_colorkey((0,0,0,0))
 
-        for y_counter, row in enumerate(self.points):
-            for x_counter, cell in enumerate(row):
-                if cell == 1:
-                    self.sprite.blit(dot, (x_counter * settings.cell_unit, y_counter * settings.cell_unit)) # This draws the pellets
+        x_start = chunk[0] * settings.chunk_size
+        y_start = chunk[1] * settings.chunk_size
+        for x_counter, y_counter, cell in camera.chunk_cells(chunk, self.points.rows):
+            if cell:
+                chunk_surface.blit(self.dot if cell == 1 else self.power_pellet,
+                                   ((x_counter - x_start) * settings.cell_unit, 
+                                    (y_counter - y_start) * settings.cell_unit)) # This draws the pellets
+        return chunk_surface
     
     def graphic_update(self):
         import screen
-        screen.screen.blit(self.sprite, (0,0))
+        screen.view.draw(self.pellets)
     
 
 default_map = Map(
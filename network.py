@@ -0,0 +1,317 @@
+import selectors
+import socket
+import struct
+import time
+
+# Server to client, length prefixed: header, then entities, then removed pellets.
+# base_tick is the acknowledged tick the snapshot is a delta of, 0 for a full snapshot.
+header_format = struct.Struct('<IIHI?')  # tick, base_tick, entity count, pellet count, game over
+entity_format = struct.Struct('<BiiB')  # entity id, x, y, direction
+pellet_format = struct.Struct('<HH')  # x, y
+length_format = struct.Struct('<I')
+# Client to server, fixed size: last received tick and the wanted direction.
+input_format = struct.Struct('<IB')
+
+position_scale = 48  # offsets are multiples of the 1/6 and 1/8 speeds, sent as fixed point
+no_input = 255
+history_length = 64  # ticks a client can lag behind before it gets a full snapshot
+final_send_timeout = 1.0  # seconds the clients have to read the last snapshot before they are dropped
+
+directions = ((0, -1), (-1, 0), (0, 1), (1, 0))
+direction_index = {direction: i for i, direction in enumerate(directions)}
+
+
+def entity_list(entities) -> list:
+    """Orders entities the same way on every machine, the id of an entity is its index."""
+    return sorted(entities, key=lambda entity: entity.name)
+
+
+def entity_state(entity) -> tuple[int, int, int]:
+    return (
+        round(entity.offset[0] * position_scale),
+        round(entity.offset[1] * position_scale),
+        direction_index[entity.direction_vector],
+    )
+
+
+def encode_snapshot(tick: int, base_tick: int, entities: dict, pellets: list, game_over: bool = False) -> bytes:
+    """Packs a snapshot into a length prefixed message.
+
+    Args:
+        tick (int): Tick of the snapshot.
+        base_tick (int): Tick the snapshot is a delta of, 0 if it is a full snapshot.
+        entities (dict): {entity id: entity_state} of the entities that changed.
+        pellets (list): Coordinates of the pellets removed since base_tick.
+        game_over (bool, optional): Whether the game ended on this tick. Defaults to False.
+
+    Returns:
+        bytes: The message.
+    """
+    message = bytearray(length_format.size + header_format.size
+                        + entity_format.size * len(entities) + pellet_format.size * len(pellets))
+    offset = length_format.size
+    header_format.pack_into(message, offset, tick, base_tick, len(entities), len(pellets), game_over)
+    offset += header_format.size
+    for entity_id, (x, y, direction) in entities.items():
+        entity_format.pack_into(message, offset, entity_id, x, y, direction)
+        offset += entity_format.size
+    for x, y in pellets:
+        pellet_format.pack_into(message, offset, x, y)
+        offset += pellet_format.size
+    length_format.pack_into(message, 0, len(message) - length_format.size)
+    return bytes(message)
+
+
+def decode_snapshot(message: bytes) -> tuple[int, int, dict, list, bool]:
+    """Unpacks a message body made by encode_snapshot, without its length prefix."""
+    tick, base_tick, entity_count, pellet_count, game_over = header_format.unpack_from(message)
+    offset = header_format.size
+    entities = {}
+    for entity_id, x, y, direction in entity_format.iter_unpack(
+            message[offset:offset + entity_format.size * entity_count]):
+        entities[entity_id] = (x, y, direction)
+    offset += entity_format.size * entity_count
+    pellets = list(pellet_format.iter_unpack(message[offset:offset + pellet_format.size * pellet_count]))
+    return tick, base_tick, entities, pellets, game_over
+
+
+class Connection():
+    def __init__(self, sock: socket.socket, player=None) -> None:
+        self.socket = sock
+        self.player = player  # None for spectators
+        self.acknowledged_tick: int = 0
+        self.incoming = bytearray()
+        self.outgoing = bytearray()
+
+    def flush(self):
+        if self.outgoing:
+            sent = self.socket.send(self.outgoing)
+            del self.outgoing[:sent]
+
+
+class Server():
+    """Authoritative game server, every tick each client gets a delta of its last acknowledged state.
+
+    Args:
+        address (tuple): Host and port to listen on.
+        entities (list): Entities to broadcast, see entity_list.
+        game_map (maps.Map): The map whose removed pellets are broadcast.
+        players (list): Entities controlled by the first clients, later clients are spectators.
+    """
+    def __init__(self, address, entities: list, game_map, players: list) -> None:
+        self.entities = entities
+        self.map = game_map
+        self.free_players = list(players)
+        self.connections: list[Connection] = []
+        self.tick: int = 0
+        self.history: dict[int, tuple[tuple, int]] = {}  # tick: (entity states, removed pellet count)
+
+        self.selector = selectors.DefaultSelector()
+        self.listener = socket.create_server(address)
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ)
+
+    def poll(self):
+        """Accepts clients and applies their inputs, without blocking."""
+        for key, _ in self.selector.select(timeout=0):
+            if key.fileobj is self.listener:
+                self.accept()
+            else:
+                self.read(key.data)
+
+    def accept(self):
+        while True:  # every pending client joins this tick
+            try:
+                sock, _ = self.listener.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connection = Connection(sock, self.free_players.pop(0) if self.free_players else None)
+            self.connections.append(connection)
+            self.selector.register(sock, selectors.EVENT_READ, connection)
+
+    def read(self, connection: Connection):
+        try:
+            data = connection.socket.recv(4096)
+        except ConnectionError:
+            data = b''
+        if not data:
+            self.disconnect(connection)
+            return
+        connection.incoming += data
+        message_count = len(connection.incoming) // input_format.size
+        for acknowledged_tick, direction in input_format.iter_unpack(
+                connection.incoming[:message_count * input_format.size]):
+            if direction != no_input and direction >= len(directions):  # not sent by a Client
+                self.disconnect(connection)
+                return
+            connection.acknowledged_tick = max(connection.acknowledged_tick, acknowledged_tick)
+            if direction != no_input and connection.player is not None:
+                connection.player.input = directions[direction]
+        del connection.incoming[:message_count * input_format.size]
+
+    def disconnect(self, connection: Connection):
+        self.selector.unregister(connection.socket)
+        connection.socket.close()
+        self.connections.remove(connection)
+        if connection.player is not None:
+            self.free_players.append(connection.player)
+
+    def broadcast(self, game_over: bool = False):
+        """Records the state of this tick and sends each client its delta, call once per tick.
+
+        Args:
+            game_over (bool, optional): Sends the snapshot even to lagging clients and waits
+                up to final_send_timeout for all of them to take it, for the last tick of the game.
+                Defaults to False.
+        """
+        self.tick += 1
+        states = tuple(entity_state(entity) for entity in self.entities)
+        self.history[self.tick] = (states, len(self.map.removed_points))
+        self.history.pop(self.tick - history_length, None)
+
+        messages = {}  # base tick: message, clients with the same acknowledged tick share it
+        deadline = time.monotonic() + final_send_timeout
+        for connection in list(self.connections):
+            if connection.outgoing and not game_over:  # the previous snapshot isn't sent yet, the next delta will catch up
+                self.send(connection)
+                continue
+            base_tick = connection.acknowledged_tick if connection.acknowledged_tick in self.history else 0
+            if base_tick not in messages:
+                messages[base_tick] = self.snapshot(base_tick, states, game_over)
+            connection.outgoing += messages[base_tick]
+            if game_over:  # the last snapshot, wait for it to be sent
+                try:
+                    connection.socket.settimeout(max(deadline - time.monotonic(), 0.001))
+                    connection.socket.sendall(connection.outgoing)
+                    connection.outgoing.clear()
+                except (socket.timeout, OSError):  # a client that stopped reading can't hold the server
+                    self.disconnect(connection)
+            else:
+                self.send(connection)
+
+    def snapshot(self, base_tick: int, states: tuple, game_over: bool = False) -> bytes:
+        if base_tick:
+            base_states, base_pellet_count = self.history[base_tick]
+            entities = {
+                entity_id: state
+                for entity_id, (state, base_state) in enumerate(zip(states, base_states))
+                if state != base_state
+            }
+        else:
+            base_pellet_count = 0
+            entities = dict(enumerate(states))
+        return encode_snapshot(self.tick, base_tick, entities, self.map.removed_points[base_pellet_count:], game_over)
+
+    def send(self, connection: Connection):
+        try:
+            connection.flush()
+        except BlockingIOError:
+            pass
+        except ConnectionError:
+            self.disconnect(connection)
+
+    def close(self):
+        for connection in list(self.connections):
+            self.disconnect(connection)
+        self.selector.unregister(self.listener)
+        self.listener.close()
+
+
+class Client():
+    """Receives snapshots from a Server and sends it inputs.
+
+    Args:
+        address (tuple): Host and port of the server.
+    """
+    def __init__(self, address) -> None:
+        self.socket = socket.create_connection(address)
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.socket.setblocking(False)
+        self.incoming = bytearray()
+        self.outgoing = bytearray()  # inputs the socket didn't take yet, sent whole to keep the framing
+
+        self.tick: int = 0
+        self.states: dict[int, dict] = {}  # tick: {entity id: entity_state}, deltas apply to their base
+        self.removed_points: set[tuple[int, int]] = set()
+        self.new_points: list[tuple[int, int]] = []  # removed pellets not yet applied to the map
+        self.connected: bool = True
+        self.game_over: bool = False
+
+    def receive(self) -> bool:
+        """Reads every available snapshot without blocking.
+
+        Returns:
+            bool: Whether a newer state was received.
+        """
+        try:
+            while data := self.socket.recv(65536):
+                self.incoming += data
+            self.connected = False  # recv returned b'', the server closed the connection
+        except BlockingIOError:
+            pass
+        except ConnectionError:
+            self.connected = False
+
+        previous_tick = self.tick
+        while len(self.incoming) >= length_format.size:
+            length = length_format.unpack_from(self.incoming)[0]
+            if len(self.incoming) < length_format.size + length:
+                break
+            self.apply_snapshot(bytes(self.incoming[length_format.size:length_format.size + length]))
+            del self.incoming[:length_format.size + length]
+
+        if self.tick != previous_tick and self.connected:
+            self.send(no_input)
+            return True
+        return False
+
+    def apply_snapshot(self, message: bytes):
+        tick, base_tick, entities, pellets, game_over = decode_snapshot(message)
+        state = dict(self.states.get(base_tick, {}))
+        state.update(entities)
+        self.states[tick] = state
+        for old_tick in [old_tick for old_tick in self.states if old_tick <= tick - history_length]:
+            del self.states[old_tick]  # received ticks aren't contiguous when the client lags
+        self.tick = max(self.tick, tick)
+        self.game_over = self.game_over or game_over
+
+        for point in pellets:
+            if point not in self.removed_points:
+                self.removed_points.add(point)
+                self.new_points.append(point)
+
+    def send(self, direction: int):
+        self.outgoing += input_format.pack(self.tick, direction)
+        try:
+            sent = self.socket.send(self.outgoing)
+            del self.outgoing[:sent]
+        except BlockingIOError:
+            pass
+        except ConnectionError:
+            self.connected = False
+
+    def send_input(self, direction_vector: tuple[int, int]):
+        self.send(direction_index[direction_vector])
+
+    def apply(self, entities: list, game_map):
+        """Moves the local entities and removes the pellets to match the latest snapshot.
+
+        Args:
+            entities (list): Local entities, see entity_list.
+            game_map (maps.Map): The local map.
+        """
+        for entity_id, (x, y, direction) in self.states.get(self.tick, {}).items():
+            entity = entities[entity_id]
+            entity.offset[0] = x / position_scale
+            entity.offset[1] = y / position_scale
+            entity.update_position()
+            if entity.direction_vector != directions[direction]:
+                entity.direction_update(directions[direction])
+        for x, y in self.new_points:
+            game_map.remove_point(x, y)
+        self.new_points.clear()
+
+    def close(self):
+        self.socket.close()
@@ -1,4 +1,5 @@
-import queue
+import heapq
+from collections import deque
 
 
 def neighbors(center_node: tuple[int], array: list[list[int]], excluded_values: tuple[int]) -> set:
@@ -22,30 +23,23 @@ def neighbors(center_node: tuple[int], array: list[list[int]], excluded_values:
             pass
     return neighbors_set
 
-def neighbor_values(center_node: tuple[int], array: list[list[int]], diagonal: bool = False) -> dict:
-    """Identify walls around a node.
+def bounded_neighbors(center_node: tuple[int], array: list[list[int]], excluded_values: tuple[int]) -> list:
+    """Like neighbors, but nodes outside of the array are never neighbors instead of wrapping around.
 
     Args:
         center_node (tuple[int]): The node whose neighbors are to be returned.
-        array (list[list[int]]): The array in which the nodes are.
+        array (list[list[int]]): The array in which the nodes are, rows may have different lengths.
+        excluded_values (tuple): Values which exclude a node from being a neighbor.
 
     Returns:
-        dict: A dict indicating whether a direction has a wall.
+        list: The immediate neighbors of allowed values.
     """
     x, y = center_node
-    neighbors_dict = dict()
-    if diagonal:
-        nodes_to_identify = ((x-1, y-1, 'up left'), (x+1, y-1, 'up right'), (x+1, y+1, 'down right'), (x-1, y+1, 'down left'))
-    else:
-        nodes_to_identify = ((x-1, y, 'left'), (x, y-1, 'up'), (x+1, y, 'right'), (x, y+1, 'down'))
-    
-    for i, j, d in nodes_to_identify:
-        try:
-            neighbors_dict[d] = (array[j][i] in (1, 4))
-        except:
-            neighbors_dict[d] = 1
-
-    return neighbors_dict
+    neighbors_list = []
+    for i, j in ((x-1, y), (x, y-1), (x+1, y), (x, y+1)):
+        if 0 <= j < len(array) and 0 <= i < len(array[j]) and array[j][i] not in excluded_values:
+            neighbors_list.append((i, j))
+    return neighbors_list
 
 
 def heuristic_cost(a, b):
@@ -54,8 +48,8 @@ def heuristic_cost(a, b):
 
 coordinates = tuple[int, int]
 def A_star(start_node: coordinates, end_node: coordinates, 
-           array: list[list[int]], wall_values: tuple[int] = 1) -> list[coordinates]:
-    """A* pathfinding from start_node to end_node in an array.
+           array: list[list[int]], wall_values: tuple[int] = (1,)) -> list[coordinates]:
+    """A* pathfinding from start_node to end_node in an array, A_star_steps run to the end.
 
     Args:
         start_node (tuple of int): starting coordinates.
@@ -63,27 +57,23 @@ def A_star(start_node: coordinates, end_node: coordinates,
         array (list of lists): array to pathfind through
         wall_values (tuple of int) : node values in the array that can't be navigated.
 
+    Returns:
+        list: list of node coordinates from (including) start_node to (including) end_node, empty if unreachable.
+    """
+    return run_steps(A_star_steps(start_node, end_node, array, wall_values))
+
+
+def rebuild_path(origin_node: dict, start_node: coordinates, end_node: coordinates) -> list[coordinates]:
+    """Walks back the origin of each node from end_node to start_node.
+
+    Args:
+        origin_node (dict): The node each node was reached from.
+        start_node (coordinates): starting coordinates.
+        end_node (coordinates): goal coordinates.
+
     Returns:
         list: list of node coordinates from (including) start_node to (including) end_node.
     """
-    nodes_to_explore = queue.PriorityQueue()
-    origin_node = dict()
-    g_cost = dict()  # g cost: # of moves from the start_node
-    nodes_to_explore.put((0, start_node))
-    origin_node[start_node] = None
-    g_cost[start_node] = 0
-
-    while not nodes_to_explore.empty():
-        current_node = nodes_to_explore.get()
-        for new_node in neighbors(current_node[1], array, wall_values):
-            new_g_cost = g_cost[current_node[1]] + 1
-            if new_node not in g_cost or new_g_cost < g_cost[new_node]:
-                g_cost[new_node] = new_g_cost
-                nodes_to_explore.put((new_g_cost + heuristic_cost(end_node, new_node), new_node))
-                origin_node[new_node] = current_node[1]
-        if current_node[1] == end_node:
-            break
-    
     active_node = end_node
     path = [active_node]
     while active_node != start_node:
@@ -93,29 +83,188 @@ def A_star(start_node: coordinates, end_node: coordinates,
     return path
 
 
-def breadth_first_map(array, start_node, wall_values: tuple[int] = (1,)):
-    """Explores an array
+def A_star_steps(start_node: coordinates, end_node: coordinates, 
+                 array: list[list[int]], wall_values: tuple[int] = (1,)):
+    """Step-wise A*, yields after each explored node so the search can be watched.
 
     Args:
-        array (list[list[int]]): Array to explore.
-        start_node ([type]): A reachable node.
-        wall_values (tuple[int], optional): Values which exclude a node from being a neighbor. Defaults to 1.
+        start_node (tuple of int): starting coordinates.
+        end_node (tuple of int): goal coordinates.
+        array (list of lists): array to pathfind through
+        wall_values (tuple of int) : node values in the array that can't be navigated.
+
+    Yields:
+        tuple: (nodes added to the frontier, node moved to the closed set).
+
+    Returns:
+        list: list of node coordinates from (including) start_node to (including) end_node, empty if unreachable.
+    """
+    nodes_to_explore = [(0, start_node)]
+    origin_node = {start_node: None}
+    g_cost = {start_node: 0}
+    closed_nodes = set()
+
+    while nodes_to_explore:
+        current_node = heapq.heappop(nodes_to_explore)[1]
+        if current_node in closed_nodes:  # stale entry, a cheaper one was already explored
+            continue
+        closed_nodes.add(current_node)
+        if current_node == end_node:
+            yield [], current_node
+            return rebuild_path(origin_node, start_node, end_node)
+
+        opened_nodes = []
+        new_g_cost = g_cost[current_node] + 1
+        for new_node in bounded_neighbors(current_node, array, wall_values):
+            if new_node not in g_cost or new_g_cost < g_cost[new_node]:
+                g_cost[new_node] = new_g_cost
+                origin_node[new_node] = current_node
+                heapq.heappush(nodes_to_explore, (new_g_cost + heuristic_cost(end_node, new_node), new_node))
+                opened_nodes.append(new_node)
+        yield opened_nodes, current_node
+    return []
+
+
+def breadth_first_steps(start_node: coordinates, end_node: coordinates, 
+                        array: list[list[int]], wall_values: tuple[int] = (1,)):
+    """Step-wise breadth first search, same interface as A_star_steps.
+
+    Args:
+        start_node (tuple of int): starting coordinates.
+        end_node (tuple of int): goal coordinates.
+        array (list of lists): array to pathfind through
+        wall_values (tuple of int) : node values in the array that can't be navigated.
+
+    Yields:
+        tuple: (nodes added to the frontier, node moved to the closed set).
+
+    Returns:
+        list: The shortest path, empty if end_node can't be reached.
+    """
+    nodes_to_explore = deque((start_node,))
+    origin_node = {start_node: None}  # doubles as the set of queued nodes
+
+    while nodes_to_explore:
+        current_node = nodes_to_explore.popleft()
+        if current_node == end_node:
+            yield [], current_node
+            return rebuild_path(origin_node, start_node, end_node)
+
+        opened_nodes = []
+        for new_node in bounded_neighbors(current_node, array, wall_values):
+            if new_node not in origin_node:
+                origin_node[new_node] = current_node
+                nodes_to_explore.append(new_node)
+                opened_nodes.append(new_node)
+        yield opened_nodes, current_node
+    return []
+
+
+def run_steps(steps) -> list[coordinates]:
+    """Exhausts a step-wise search and returns its path."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as result:
+            return result.value
+
+
+def component_labels(array: list[list[int]], wall_values: tuple[int] = (1,)) -> list[list[int]]:
+    """Labels every connected region of an array in two passes (union-find).
+
+    Args:
+        array (list[list[int]]): Array to label, rows may have different lengths.
+        wall_values (tuple[int], optional): Values which exclude a node from being a neighbor. Defaults to (1,).
+
+    Returns:
+        list[list[int]]: Array of the same shape, 0 for walls and 1.. for each region.
+    """
+    parent = [0]  # parent[label] is the label it was merged into, 0 is reserved for walls
+
+    def find(label):
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]  # path halving
+            label = parent[label]
+        return label
+
+    labels = []
+    previous_row = []
+    for row in array:
+        label_row = [0] * len(row)
+        left = 0
+        for x, cell in enumerate(row):
+            if cell in wall_values:
+                left = 0
+                continue
+            up = previous_row[x] if x < len(previous_row) else 0
+            if left and up:
+                left, up = find(left), find(up)
+                if left != up:
+                    parent[max(left, up)] = min(left, up)
+                label = min(left, up)
+            elif left or up:
+                label = left or up
+            else:
+                label = len(parent)
+                parent.append(label)
+            label_row[x] = left = label
+        labels.append(label_row)
+        previous_row = label_row
+
+    compact = [0] * len(parent)  # renumber the roots as 1, 2, 3...
+    region_count = 0
+    for label in range(1, len(parent)):
+        root = find(label)  # a root is always the smallest label of its region
+        if root == label:
+            region_count += 1
+            compact[label] = region_count
+        else:
+            compact[label] = compact[root]
+
+    for label_row in labels:
+        for x, label in enumerate(label_row):
+            label_row[x] = compact[label]
+    return labels
+
+
+def reachable_nodes(labels: list[list[int]], start_node: coordinates) -> set:
+    """Nodes in the same region as start_node.
+
+    Args:
+        labels (list[list[int]]): Output of component_labels.
+        start_node (coordinates): A reachable node.
+
+    Returns:
+        set: Reachable nodes, empty if start_node is a wall.
+    """
+    start_label = labels[start_node[1]][start_node[0]]
+    if not start_label:
+        return set()
+    return {
+        (x, y)
+        for y, row in enumerate(labels)
+        for x, label in enumerate(row)
+        if label == start_label
+    }
+
+
+def unreachable_nodes(labels: list[list[int]], start_node: coordinates) -> set:
+    """Non-wall nodes outside of the region of start_node.
+
+    Args:
+        labels (list[list[int]]): Output of component_labels.
+        start_node (coordinates): A reachable node.
 
     Returns:
-        set: Reachable nodes.
+        set: Unreachable nodes.
     """
-    nodes_to_explore = queue.Queue()
-    explored_nodes = set()
-    nodes_to_explore.put(start_node)
-
-    while not nodes_to_explore.empty():
-        current_node = nodes_to_explore.get()
-        for new_node in neighbors(current_node, array, wall_values):
-            if new_node not in explored_nodes:
-                nodes_to_explore.put(new_node)
-            explored_nodes.add(current_node)
-    
-    return explored_nodes
+    start_label = labels[start_node[1]][start_node[0]]
+    return {
+        (x, y)
+        for y, row in enumerate(labels)
+        for x, label in enumerate(row)
+        if label and label != start_label
+    }
 
 
 def triangulation(start_node: coordinates, end_node: coordinates, 
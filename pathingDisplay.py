@@ -1,52 +1,39 @@
 import pygame
 import random
+import sys
 import tools
 import pathing
 
 pygame.init()
 
-u = 4
+u = 1
 
-array_size = 250
+steps_per_frame = 500  # explored nodes per algorithm per frame
+
+algorithms = (pathing.A_star_steps, pathing.breadth_first_steps)  # drawn side by side
+
+display = pygame.display.Info()
+array_size = min(1000, display.current_w // (u * len(algorithms)), display.current_h // u)  # every pane fits on screen
 
 white = 255, 255, 255
 black = 0,0,0
-orange = 255, 153, 0, 120 # explored
-cyan = 0, 230, 230, 120 # to explore
+orange = 255, 153, 0 # explored
+cyan = 0, 230, 230 # to explore
 green = 0, 255, 0 # origin
 red = 255, 0, 0 # goal
+blue = 0, 0, 255 # path
 
-screen = pygame.display.set_mode((array_size * u, array_size * u), flags=pygame.NOFRAME)
-background = pygame.Surface((array_size * u, array_size * u))
-
-def create_square(color, alpha=255):
-    square = pygame.Surface((u, u))
-    square.fill(color)
-    square.set_alpha(alpha)
-    return square
-
-black_square = create_square(black)
-orange_square = create_square(orange, 120)
-cyan_square = create_square(cyan, 120)
-outer_square = create_square(white)
-
-arial = pygame.freetype.SysFont('arial', 10)
-
-random_array = tools.create_empty_array(array_size, array_size)
+pane_size = array_size * u
+screen = pygame.display.set_mode((pane_size * len(algorithms), pane_size), flags=pygame.NOFRAME)
+clock = pygame.time.Clock()
 
-class Point():
-    def __init__(self, x, y) -> None:
-        self.x = x
-        self.y = y
+random_array = tools.empty_array(array_size, array_size)
 
 
 # randomly set origin and end
 origin = (random.randrange(array_size), random.randrange(array_size))
 end = (random.randrange(array_size), random.randrange(array_size))
 
-for point, value in ((origin, 2), (end, 3)):
-    random_array[point[1]][point[0]] = value
-
 # randomly place walls
 for row in random_array:
     for _ in range(int(array_size * 0.2)):
@@ -56,19 +43,72 @@ for row in random_array:
                 row[position] = 1
                 break
 
-# make background
-for y_counter, row in enumerate(random_array):
-    for x_counter, cell in enumerate(row):
-        background.blit(outer_square, (x_counter * u, y_counter * u))
-        if random_array[y_counter][x_counter] == 1:
-            background.blit(black_square, (x_counter * u, y_counter * u))
+for point in (origin, end):
+    random_array[point[1]][point[0]] = 0
+
+
+class Pane():
+    def __init__(self, algorithm, x_offset) -> None:
+        self.steps = algorithm(origin, end, random_array)
+        self.x_offset = x_offset
+        self.path = None
+
+    def cell_rect(self, node):
+        return pygame.Rect(self.x_offset + node[0] * u, node[1] * u, u, u)
+
+    def draw_background(self):
+        screen.fill(white, (self.x_offset, 0, pane_size, pane_size))
+        for y_counter, row in enumerate(random_array):
+            for x_counter, cell in enumerate(row):
+                if cell == 1:
+                    screen.fill(black, self.cell_rect((x_counter, y_counter)))
+        for point, color in ((origin, green), (end, red)):
+            screen.fill(color, self.cell_rect(point))
+
+    def advance(self) -> list[pygame.Rect]:
+        """Runs steps_per_frame steps and draws the cells they changed.
+
+        Returns:
+            list[pygame.Rect]: Dirty rects of the changed cells.
+        """
+        if self.path is not None:
+            return []
+
+        opened_cells = []
+        closed_cells = []
+        path_cells = []
+        for _ in range(steps_per_frame):
+            try:
+                opened_nodes, closed_node = next(self.steps)
+            except StopIteration as result:
+                self.path = path_cells = result.value
+                break
+            opened_cells.extend(opened_nodes)
+            closed_cells.append(closed_node)
 
-screen.blit(background, (0,0))
-screen.blit(create_square(green, 120), (origin[0] * u, origin[1] * u))
-screen.blit(create_square(red, 120), (end[0] * u, end[1] * u))
+        dirty_rects = []
+        for cells, color in ((opened_cells, cyan), (closed_cells, orange), (path_cells, blue)):
+            for node in cells:
+                rect = self.cell_rect(node)
+                screen.fill(color, rect)
+                dirty_rects.append(rect)
+        return dirty_rects
 
 
-for i in pathing.A_star(origin, end, random_array, (0, 3)):
-    screen.blit(cyan_square, (i[0]*u, i[1]*u), )
+panes = [Pane(algorithm, pane_size * i) for i, algorithm in enumerate(algorithms)]
+for pane in panes:
+    pane.draw_background()
 pygame.display.flip()
-print(input())
\ No newline at end of file
+
+while True:
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+            sys.exit()
+
+    dirty_rects = []
+    for pane in panes:
+        dirty_rects.extend(pane.advance())
+    if dirty_rects:
+        pygame.display.update(dirty_rects)
+
+    clock.tick(60)
@@ -0,0 +1,95 @@
+from collections import deque
+import pathing
+
+
+class PelletStore():
+    """Pellet grid in a bytearray, 1 is a pellet and 2 a power pellet.
+
+    Keeps count of the remaining pellets so a cleared level is known without a scan.
+
+    Args:
+        point_map (list[list[int]]): Pellet values, rows may have different lengths.
+    """
+    def __init__(self, point_map: list[list[int]]) -> None:
+        self.width: int = max(len(row) for row in point_map)
+        self.height: int = len(point_map)
+        self.cells = bytearray(self.width * self.height)
+        for y, row in enumerate(point_map):
+            self.cells[y * self.width:y * self.width + len(row)] = bytes(row)
+        self.count()
+        view = memoryview(self.cells)
+        self.rows = [view[y * self.width:(y + 1) * self.width] for y in range(self.height)]  # read only use
+
+    def count(self):
+        self.remaining: int = len(self.cells) - self.cells.count(0)
+        self.power_remaining: int = self.cells.count(2)
+
+    def set_cells(self, cells: bytes):
+        """Replaces every pellet value, cells must be width * height bytes."""
+        if len(cells) != len(self.cells):
+            raise ValueError(f'Expected {len(self.cells)} pellet cells, got {len(cells)}')
+        self.cells[:] = cells
+        self.count()
+
+    def copy(self):
+        return PelletStore([self.cells[y * self.width:(y + 1) * self.width] for y in range(self.height)])
+
+    def get(self, x: int, y: int) -> int:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cells[y * self.width + x]
+        return 0
+
+    def eat(self, x: int, y: int) -> int:
+        """Removes a pellet.
+
+        Returns:
+            int: The value of the removed pellet, 0 if there was none.
+        """
+        value = self.get(x, y)
+        if value:
+            self.cells[y * self.width + x] = 0
+            self.remaining -= 1
+            if value == 2:
+                self.power_remaining -= 1
+        return value
+
+    @property
+    def cleared(self) -> bool:
+        return self.remaining == 0
+
+    def region_count(self, left: int, top: int, right: int, bottom: int) -> int:
+        """Counts the pellets in the cells from (left, top) to (right, bottom) excluded."""
+        left, right = max(left, 0), min(right, self.width)
+        if right <= left:
+            return 0
+        count = 0
+        for y in range(max(top, 0), min(bottom, self.height)):
+            start = y * self.width
+            count += right - left - self.cells.count(0, start + left, start + right)
+        return count
+
+    def nearest(self, start_node: tuple[int, int], walls: list[list[int]],
+                wall_values: tuple[int] = (1,)) -> tuple[int, int] | None:
+        """Breadth first search of the closest pellet by path length.
+
+        Args:
+            start_node (tuple[int, int]): Where the search starts.
+            walls (list[list[int]]): Walls array of the map.
+            wall_values (tuple[int], optional): Values which exclude a node from being a neighbor. Defaults to (1,).
+
+        Returns:
+            tuple[int, int] | None: Coordinates of the pellet, None if none is reachable.
+        """
+        if not self.remaining:
+            return None
+        nodes_to_explore = deque((start_node,))
+        explored_nodes = {start_node}
+        while nodes_to_explore:
+            current_node = nodes_to_explore.popleft()
+            if self.get(*current_node):
+                return current_node
+            for new_node in pathing.bounded_neighbors(current_node, walls, wall_values):
+                if new_node not in explored_nodes:
+                    explored_nodes.add(new_node)
+                    nodes_to_explore.append(new_node)
+        return None
@@ -0,0 +1,236 @@
+import atexit
+import collections
+import contextlib
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+source_directory = os.path.dirname(os.path.abspath(__file__))
+
+
+class FrameProfiler():
+    """Opt-in allocation and GC pause tracking for the frame loop.
+
+    Every frame, sections measure the peak allocation of a subsystem, gc callbacks time
+    every collection, and a tracemalloc snapshot is diffed against the previous frame to
+    find the memory retained across frames. Snapshots are taken after the frame time is
+    stamped, and collections they trigger aren't counted as the game's.
+
+    One frame in sample_interval also finds the allocating call sites of each section:
+    the section is snapshotted on entry, on exit, and whenever a function returns holding
+    sample_bytes more than before, so temporaries freed before the section ends (deep
+    copies, neighbor sets) are credited as well as what it keeps. That slows the frame
+    down a lot and its snapshots take memory, so sampled frames are left out of the frame
+    times and section peaks. Allocations are credited
+    to the innermost frame in this project, a deepcopy shows as its caller.
+    Everything is a no-op when disabled.
+
+    Args:
+        enabled (bool, optional): Whether anything is measured. Defaults to False.
+        top_count (int, optional): Call sites in the report. Defaults to 10.
+        sample_interval (int, optional): Frames between two sampled frames. Defaults to 10.
+        sample_bytes (int, optional): Growth that triggers a snapshot in a sampled section,
+            lower finds smaller temporaries but runs slower. Defaults to 4096.
+        frame_depth (int, optional): Frames kept per allocation to find the project frame. Defaults to 8.
+    """
+    def __init__(self, enabled: bool = False, top_count: int = 10, sample_interval: int = 10,
+                 sample_bytes: int = 4096, frame_depth: int = 8) -> None:
+        self.enabled = enabled
+        self.top_count = top_count
+        self.sample_interval = sample_interval
+        self.sample_bytes = sample_bytes
+        self.frame_depth = frame_depth
+
+        self.frame_count: int = 0
+        self.sampled_frames: int = 0
+        self.frame_times: list[float] = []  # of the frames that weren't sampled
+        self.frame_gc_pauses: list[float] = []
+        self.section_bytes: dict[str, list[int]] = collections.defaultdict(list)  # of the frames that weren't sampled
+        self.call_site_bytes: collections.Counter = collections.Counter()  # (section, call site): bytes
+        self.call_site_blocks: collections.Counter = collections.Counter()
+        self.retained_bytes: collections.Counter = collections.Counter()  # call site: bytes
+        self.retained_blocks: collections.Counter = collections.Counter()
+        self.gc_pauses: dict[int, list[float]] = collections.defaultdict(list)  # generation: pauses
+
+        self._snapshot = None
+        self._frame_start: float = 0
+        self._frame_gc_pause: float = 0
+        self._gc_start: float = 0
+        self._measuring: bool = False  # collections triggered by the profiler aren't the game's
+        self._entry_snapshot = None  # of the sampled section
+        self._peak_growth: dict = {}  # call site: [bytes, blocks], largest seen in the sampled section
+        self._sampled_bytes: int = 0  # lowest memory held since the last snapshot of the section
+        self._filters = (  # built once, filters allocate when created
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__, all_frames=True),  # the profiler's own work, even inside game calls
+        )
+
+    def start(self):
+        if not self.enabled:
+            return
+        tracemalloc.start(self.frame_depth)
+        gc.callbacks.append(self._gc_callback)
+        atexit.register(self.report)
+        self._snapshot = self._take_snapshot()
+        self._frame_start = time.perf_counter()
+
+    def stop(self):
+        if not self.enabled or not tracemalloc.is_tracing():
+            return
+        gc.callbacks.remove(self._gc_callback)
+        tracemalloc.stop()
+
+    @property
+    def sampling(self) -> bool:
+        """Whether the current frame looks for allocating call sites."""
+        return self.frame_count % self.sample_interval == 0
+
+    def _gc_callback(self, phase, info):
+        if self._measuring:
+            return
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+        else:
+            pause = time.perf_counter() - self._gc_start
+            self.gc_pauses[info['generation']].append(pause)
+            self._frame_gc_pause += pause
+
+    def _take_snapshot(self):
+        self._measuring = True
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        self._measuring = False
+        return snapshot
+
+    def _growth(self, snapshot, previous) -> dict:
+        """Bytes and blocks gained per call site, the call site is the innermost project frame."""
+        self._measuring = True
+        growth = collections.defaultdict(lambda: [0, 0])
+        for stat in snapshot.compare_to(previous, 'traceback'):
+            if stat.size_diff > 0:
+                call_site = str(next((frame for frame in reversed(stat.traceback)
+                                      if frame.filename.startswith(source_directory)), stat.traceback[-1]))
+                growth[call_site][0] += stat.size_diff
+                growth[call_site][1] += stat.count_diff
+        self._measuring = False
+        return growth
+
+    def _merge_growth(self, snapshot):
+        """Keeps the largest growth of each call site seen in the sampled section."""
+        for call_site, (size, blocks) in self._growth(snapshot, self._entry_snapshot).items():
+            if size > self._peak_growth.get(call_site, (0, 0))[0]:
+                self._peak_growth[call_site] = [size, blocks]
+
+    def _sample_peak(self, frame, event, arg):
+        """Profile hook, snapshots the section when a function returns holding sample_bytes more than before."""
+        if event != 'return':
+            return
+        current = tracemalloc.get_traced_memory()[0]
+        if current - self._sampled_bytes >= self.sample_bytes:
+            self._merge_growth(self._take_snapshot())
+            self._sampled_bytes = current
+        else:
+            self._sampled_bytes = min(self._sampled_bytes, current)  # a freed temporary lowers the bar
+
+    def section(self, name: str):
+        """Context manager measuring the bytes allocated by a subsystem this frame."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        if self.sampling:
+            return self._sampled_section(name)
+        return self._section(name)
+
+    @contextlib.contextmanager
+    def _section(self, name):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        yield
+        self.section_bytes[name].append(tracemalloc.get_traced_memory()[1] - start)
+
+    @contextlib.contextmanager
+    def _sampled_section(self, name):
+        self._entry_snapshot = self._take_snapshot()
+        self._peak_growth = {}
+        self._sampled_bytes = tracemalloc.get_traced_memory()[0]
+        previous_hook = sys.getprofile()
+        sys.setprofile(self._sample_peak)
+        try:
+            yield
+        finally:
+            sys.setprofile(previous_hook)
+
+        self._merge_growth(self._take_snapshot())  # temporaries count once per section, at their largest
+        for call_site, (size, blocks) in self._peak_growth.items():
+            self.call_site_bytes[name, call_site] += size
+            self.call_site_blocks[name, call_site] += blocks
+        self._entry_snapshot = None
+
+    def end_frame(self):
+        """Records the frame and diffs the memory held with the previous frame, call once per tick."""
+        if not self.enabled:
+            return
+        frame_time = time.perf_counter() - self._frame_start  # before the snapshot, it isn't the game's time
+        if self.sampling:
+            self.sampled_frames += 1
+        else:
+            self.frame_times.append(frame_time)
+            self.frame_gc_pauses.append(self._frame_gc_pause)
+        self.frame_count += 1
+
+        snapshot = self._take_snapshot()
+        for call_site, (size, blocks) in self._growth(snapshot, self._snapshot).items():
+            self.retained_bytes[call_site] += size
+            self.retained_blocks[call_site] += blocks
+        self._snapshot = snapshot
+
+        self._frame_gc_pause = 0
+        self._frame_start = time.perf_counter()
+
+    def summary(self) -> dict:
+        """Aggregated measurements, meant to be asserted on by benchmarks.
+
+        Returns:
+            dict: frame, gc, per section peak, per section call site and retained growth statistics.
+        """
+        frames = max(len(self.frame_times), 1)
+        return {
+            'frames': self.frame_count,
+            'sampled_frames': self.sampled_frames,
+            'mean_frame_ms': sum(self.frame_times) / frames * 1000,
+            'max_frame_ms': max(self.frame_times, default=0) * 1000,
+            'max_frame_gc_ms': max(self.frame_gc_pauses, default=0) * 1000,
+            'gc': {
+                generation: {'collections': len(pauses), 'total_ms': sum(pauses) * 1000, 'max_ms': max(pauses) * 1000}
+                for generation, pauses in sorted(self.gc_pauses.items())
+            },
+            'sections': {
+                name: {'mean_bytes': sum(sizes) / len(sizes), 'max_bytes': max(sizes)}
+                for name, sizes in self.section_bytes.items()
+            },
+            'call_sites': [
+                (section, call_site, size, self.call_site_blocks[section, call_site])
+                for (section, call_site), size in self.call_site_bytes.most_common(self.top_count)
+            ],
+            'retained': [
+                (call_site, size, self.retained_blocks[call_site])
+                for call_site, size in self.retained_bytes.most_common(self.top_count)
+            ],
+        }
+
+    def report(self):
+        summary = self.summary()
+        print(f"Frames: {summary['frames']} ({summary['sampled_frames']} sampled, not timed), "
+              f"mean {summary['mean_frame_ms']:.2f} ms, max {summary['max_frame_ms']:.2f} ms, "
+              f"max GC pause in a frame {summary['max_frame_gc_ms']:.2f} ms")
+        for generation, stats in summary['gc'].items():
+            print(f"GC generation {generation}: {stats['collections']} collections, "
+                  f"{stats['total_ms']:.2f} ms total, {stats['max_ms']:.2f} ms max")
+        for name, stats in summary['sections'].items():
+            print(f"{name}: {stats['mean_bytes']:.0f} B/frame mean, {stats['max_bytes']} B max")
+        print(f"Top {self.top_count} allocating call sites over {summary['sampled_frames']} sampled frames:")
+        for section, call_site, size, blocks in summary['call_sites']:
+            print(f'    {section}: {call_site}: {size} B in {blocks} blocks')
+        print(f'Top {self.top_count} call sites by memory retained across frames:')
+        for call_site, size, blocks in summary['retained']:
+            print(f'    {call_site}: {size} B in {blocks} blocks')
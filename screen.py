@@ -1,6 +1,7 @@
 import pygame
 import settings
 import maps
+import camera
 
 
 def scaled_option(toggle):
@@ -13,10 +14,12 @@ current_map =  getattr(maps, settings.selected_map)
 
 cu = settings.cell_unit
 gu = cu * 2  # Graphical Unit
+viewport_width, viewport_height = settings.viewport_size or (current_map.width, current_map.height)
 screen = pygame.display.set_mode(
-    (current_map.width * cu, current_map.height * cu),
+    (min(viewport_width, current_map.width) * cu, min(viewport_height, current_map.height) * cu),
     scaled_option(settings.scaling_toggle)
 )
+view = camera.Camera(screen, current_map.width, current_map.height)
 
 pygame.display.set_caption('Pacman')
 pygame.display.set_icon(pygame.image.load('image_files\pac_right_2.png'))
@@ -44,19 +47,28 @@ inner_corner_type_to_rotation = {
     13: 90
 }
 
-background = pygame.Surface((current_map.width * cu, current_map.height * cu))
-for y_counter, row in enumerate(current_map.wall_types):
-    for x_counter, cell in enumerate(row):
-        if cell == 0:
-            continue
-        elif cell in (1, 3, 5, 7): # walls
-            square = pygame.image.load('image_files\wall.png')
-            square = pygame.transform.rotate(square, wall_type_to_rotation[cell])
-        elif cell in (2, 4, 6, 8): # outer corner
-            square = pygame.image.load('image_files\outer_corner.png')
-            square = pygame.transform.rotate(square, outer_corner_type_to_rotation[cell])
-        elif cell in (10, 11, 12, 13): #inner corner
-            square = pygame.image.load('image_files\inner_corner.png')
-            square = pygame.transform.rotate(square, inner_corner_type_to_rotation[cell])
-        
-        background.blit(square, (x_counter * cu, y_counter * cu)) # This draws the current_map
+wall_sprite = pygame.image.load('image_files\wall.png')
+outer_corner_sprite = pygame.image.load('image_files\outer_corner.png')
+inner_corner_sprite = pygame.image.load('image_files\inner_corner.png')
+
+wall_type_sprites = {  # rotated once here instead of for every cell
+    **{cell: pygame.transform.rotate(wall_sprite, rotation)
+       for cell, rotation in wall_type_to_rotation.items()},
+    **{cell: pygame.transform.rotate(outer_corner_sprite, rotation)
+       for cell, rotation in outer_corner_type_to_rotation.items()},
+    **{cell: pygame.transform.rotate(inner_corner_sprite, rotation)
+       for cell, rotation in inner_corner_type_to_rotation.items()},
+}
+
+
+def background_chunk(chunk: tuple[int, int]) -> pygame.Surface:
+    chunk_surface = pygame.Surface((settings.chunk_size * cu, settings.chunk_size * cu))
+    x_start = chunk[0] * settings.chunk_size
+    y_start = chunk[1] * settings.chunk_size
+    for x_counter, y_counter, cell in camera.chunk_cells(chunk, current_map.wall_types):
+        if cell in wall_type_sprites:
+            chunk_surface.blit(wall_type_sprites[cell], 
+                               ((x_counter - x_start) * cu, (y_counter - y_start) * cu)) # This draws the current_map
+    return chunk_surface
+
+background = camera.ChunkCache(background_chunk)
@@ -14,9 +14,23 @@ scaling_toggle: bool = True
 
 display_targets: bool = False
 
+profile_allocations: bool = False  # prints an allocation and GC report on exit
+report_input_latency: bool = False  # prints input to turn latency on exit
+
 scatter_duration: int = 7000
 chase_duration: int = 20000
 
 pellet_value = 10
 
 selected_map = "default_map"
+
+viewport_size: tuple[int, int] | None = None  # cells shown around the player, None shows the whole map
+chunk_size: int = 16  # cells per side of a cached map chunk
+chunk_cache_bytes: int = 64 * 1024 ** 2  # memory budget of each chunk layer
+
+network_mode: str | None = None  # None for a local game, 'server' to host it, 'client' to join one
+server_address: tuple[str, int] = ('127.0.0.1', 50505)
+
+replay_file: str | None = None  # a local game records its inputs there, export mode plays them back
+export_directory: str | None = None  # plays replay_file headless and unpaced, writing every frame there
+export_format: str = 'png'  # 'png' sequence or 'raw' RGB frames in one file
@@ -1,3 +1,4 @@
+import numpy as np
 import pathing
 
 original_map = [  # 0 is empty, 1 is a wall, 2 is a turning point
@@ -36,33 +37,64 @@ original_map = [  # 0 is empty, 1 is a wall, 2 is a turning point
 
 
 def unreachable_mapper(array, start_node: tuple[int] = (1,1)):
-    grid_map = pathing.breadth_first_map(array, start_node)
+    labels = pathing.component_labels(array)
+    start_label = labels[start_node[1]][start_node[0]]
     return [
         [
-            4 if (x, y) not in grid_map and i not in (1, 3)
+            4 if label != start_label and i not in (1, 3)
             else i
-            for x, i in enumerate(row)
+            for i, label in zip(row, label_row)
         ]
-        for y, row in enumerate(array)
+        for row, label_row in zip(array, labels)
     ]
 
 
+def padded_array(array, fill: int = 0):
+    """Copies a list of rows of any lengths into a rectangular numpy array.
+
+    Returns:
+        tuple: (the array, the length of each row)
+    """
+    lengths = np.array([len(row) for row in array], dtype=np.intp)
+    padded = np.full((len(array), max(lengths.max(initial=0), 1)), fill, dtype=np.int32)
+    for y, row in enumerate(array):
+        padded[y, :len(row)] = row
+    return padded, lengths
+
+
+def shifted_mask(mask, lengths, width: int, dx: int, dy: int, outside: bool):
+    """Value of the (x + dx, y + dy) neighbor of every cell, indexed the way lists are.
+
+    Like array[y + dy][x + dx], an index of -1 wraps to the last row or the last cell of
+    the row, and a neighbor past the end of its row or of the array gets outside.
+    """
+    height = mask.shape[0]
+    ys = np.arange(height)[:, None] + dy
+    ys = np.where(ys == -1, height - 1, ys)
+    inside = ys < height
+    ys = np.minimum(ys, height - 1)
+    row_lengths = lengths[ys]
+    xs = np.arange(width)[None, :] + dx
+    xs = np.where(xs == -1, row_lengths - 1, xs)
+    inside = inside & (xs >= 0) & (xs < row_lengths)
+    values = mask[ys, np.clip(xs, 0, mask.shape[1] - 1)]
+    return np.where(inside, values, outside)
+
+
+def unpadded_list(padded, lengths):
+    return [row[:length].tolist() for row, length in zip(padded, lengths)]
+
+
 def intersection_mapper(array):
-    def intersection_check(i, x, y):  # The nested function is bad because of the array lookup
-        if i in (1, 3, 4):
-            return i
-        elif len(pathing.neighbors((x, y), array, (1, 3))) >= 3:
-            return 2
-        else:
-            return 0
-    
-    return[
-        [
-            intersection_check(i, x, y)
-            for x, i in enumerate(row)
-        ]
-        for y, row in enumerate(array)
-    ]
+    padded, lengths = padded_array(array)
+    width = padded.shape[1]
+    open_cells = ~np.isin(padded, (1, 3))
+    open_neighbors = sum(  # neighbour count convolution
+        shifted_mask(open_cells, lengths, width, dx, dy, False).astype(np.int8)
+        for dx, dy in ((-1, 0), (0, -1), (1, 0), (0, 1))
+    )
+    intersections = np.where(open_neighbors >= 3, 2, 0)
+    return unpadded_list(np.where(np.isin(padded, (1, 3, 4)), padded, intersections), lengths)
 
 
 def print_array(array):
@@ -74,57 +106,29 @@ def empty_array(width, height):
     return [[0] * width for _ in range(height)]
 
 def points_mapper(array):
-    return [
-        [
-            1 if cell == 0
-            else 0
-            for cell in row
-        ]
-        for row in array
-    ]
+    padded, lengths = padded_array(array, 1)
+    return unpadded_list((padded == 0).astype(np.int8), lengths)
+
+
+# Index: left * 8 + up * 4 + right * 2 + down, with 1 for a wall. -1 isn't a known shape.
+wall_type_table = np.full(16, -1, dtype=np.int8)
+for neighbors, wall_type in (((1, 0, 1, 1), 1), ((1, 0, 0, 1), 2), ((1, 1, 0, 1), 3), ((1, 1, 0, 0), 4),
+                             ((1, 1, 1, 0), 5), ((0, 1, 1, 0), 6), ((0, 1, 1, 1), 7), ((0, 0, 1, 1), 8)):
+    wall_type_table[neighbors[0] * 8 + neighbors[1] * 4 + neighbors[2] * 2 + neighbors[3]] = wall_type
+
+# Index: up left * 8 + up right * 4 + down right * 2 + down left, used when all 4 sides are walls.
+corner_type_table = np.full(16, -1, dtype=np.int8)
+for neighbors, corner_type in (((1, 1, 1, 1), 0), ((0, 1, 1, 1), 10), ((1, 0, 1, 1), 11),
+                               ((1, 1, 0, 1), 12), ((1, 1, 1, 0), 13)):
+    corner_type_table[neighbors[0] * 8 + neighbors[1] * 4 + neighbors[2] * 2 + neighbors[3]] = corner_type
+
+
+def neighborhood_code(walls, lengths, width, offsets):
+    code = np.zeros((walls.shape[0], width), dtype=np.int8)
+    for dx, dy in offsets:
+        code = code * 2 + shifted_mask(walls, lengths, width, dx, dy, True)
+    return code
 
-def wall_type_check(center_node, array):
-    neighbors_dict = pathing.neighbor_values(center_node, array)
-    if array[center_node[1]][center_node[0]] in (0, 2):
-        return 0
-    match (neighbors_dict['left'], neighbors_dict['up'], neighbors_dict['right'], neighbors_dict['down']):
-        case (1, 1, 1, 1):
-            return corner_type_check(center_node, array)
-        case (1, 0, 1, 1):
-            return 1
-        case (1, 0, 0, 1):
-            return 2
-        case (1, 1, 0, 1):
-            return 3
-        case (1, 1, 0, 0):
-            return 4
-        case (1, 1, 1, 0):
-            return 5
-        case (0, 1, 1, 0):
-            return 6
-        case (0, 1, 1, 1):
-            return 7
-        case (0, 0, 1, 1):
-            return 8
-        case  _:
-            raise NotImplementedError
-
-
-def corner_type_check(center_node, array):
-    neighbors_dict = pathing.neighbor_values(center_node, array, True)
-    match (neighbors_dict['up left'], neighbors_dict['up right'], neighbors_dict['down right'], neighbors_dict['down left']):
-        case (1, 1, 1, 1):
-            return 0
-        case (0, 1, 1, 1):
-            return 10
-        case (1, 0, 1, 1):
-            return 11
-        case (1, 1, 0, 1):
-            return 12
-        case (1, 1, 1, 0):
-            return 13
-        case _:
-            raise NotImplementedError
 
 def wall_type_mapper(array):
     """Generates an array based on the cells' neighbors in an input array
@@ -135,10 +139,13 @@ def wall_type_mapper(array):
     Returns:
         list(list): Array filled with values corresponding to the type of wall
     """
-    return [
-        [
-            wall_type_check((x, y), array)
-            for x in range(len(array[0]))
-        ]
-        for y in range(len(array))
-    ]
+    padded, lengths = padded_array(array)
+    width = len(array[0])
+    walls = np.isin(padded, (1, 4))
+    sides = neighborhood_code(walls, lengths, width, ((-1, 0), (0, -1), (1, 0), (0, 1)))
+    diagonals = neighborhood_code(walls, lengths, width, ((-1, -1), (1, -1), (1, 1), (-1, 1)))
+    wall_types = np.where(sides == 15, corner_type_table[diagonals], wall_type_table[sides])
+    wall_types = np.where(np.isin(padded[:, :width], (0, 2)), 0, wall_types)
+    if (wall_types == -1).any():
+        raise NotImplementedError
+    return wall_types.tolist()